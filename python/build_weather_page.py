@@ -24,12 +24,33 @@ Hvis nettleseren blokkerer filtilgang (sjeldent):
 
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
+import os
 import shutil
+import string
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+try:
+    # Valgfritt: mye raskere JSON-skriving (kan serialisere numpy direkte)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Valgfritt: flertrådet, fusjonert array-aritmetikk uten mellomlagre
+    import numexpr as ne
+except ImportError:
+    ne = None
 
 # -------------------- Konfig ------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,542 +65,121 @@ SNOW_PARQUET_FILE = STORE_DIR / "snow.parquet"
 SNOW_CSV_FILE = MANUAL_DIR / "sno.csv"
 SNOW_JSON_FILE = DATA_DIR / "snow.json"
 MANIFEST_FILE = DATA_DIR / "manifest.json"
+INGESTED_FILE = STORE_DIR / "ingested.json"
+SNOW_STAMP_FILE = STORE_DIR / "sno.stamp"  # mtime+størrelse ved forrige snøimport
 INDEX_HTML = BASE_DIR / "index.html"
 
 POSSIBLE_ENCODINGS = ["utf-8", "latin-1", "cp1252"]
+SNIFF_BYTES = 64 * 1024  # prefiks for encoding-/skilletegn-sniffing
 
 # -------------------- HTML --------------------------------------------------
-HTML_TEMPLATE = r"""
-<!DOCTYPE html>
-<html lang="no">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  <title>Vær – historikk</title>
-  <script src="https://cdn.plot.ly/plotly-2.32.0.min.js"></script>
-  <style>
-    :root{--bg:#0b1220;--card:#0f1a2f;--muted:#93a4bf;--border:#1e2a44}
-    body{margin:0;font-family:system-ui,-apple-system,Segoe UI,Roboto,Ubuntu; background:var(--bg); color:#e6edf7}
-    header{padding:16px 18px;border-bottom:1px solid var(--border);display:flex;gap:14px;align-items:center;flex-wrap:wrap}
-    header h1{font-size:18px;margin:0;font-weight:650;letter-spacing:.2px}
-    .pill{background:var(--card);border:1px solid var(--border);padding:10px 12px;border-radius:14px;display:flex;gap:10px;align-items:center}
-    select{background:#0b1326;border:1px solid var(--border);color:#e6edf7;border-radius:10px;padding:8px 10px;font-size:14px}
-    .meta{color:var(--muted);font-size:12px}
-    main{padding:14px}
-    .grid{display:grid;grid-template-columns:1fr;gap:14px}
-    .card{background:var(--card);border:1px solid var(--border);border-radius:18px;padding:8px}
-    .card h2{font-size:15px;margin:10px 12px}
-    .plot{height:360px}
-    footer{padding:14px 18px;color:var(--muted);font-size:12px}
-  </style>
-</head>
-<body>
-  <header>
-    <h1>Vær – historikk</h1>
-    <div class="pill">
-      <span class="meta">Periode</span>
-      <select id="month"></select>
-      <span class="meta" id="info"></span>
-    </div>
-  </header>
-
-  <main>
-    <div class="grid">
-      <section class="card">
-        <h2>Temperatur (°C)</h2>
-        <div id="temp" class="plot"></div>
-        <div id="temp_stats" class="meta" style="padding:0 12px 10px 12px"></div>
-      </section>
-      
-      <section class="card">
-        <h2>Vind (m/s)</h2>
-        <div id="wind" class="plot"></div>
-        <div id="wind_stats" class="meta" style="padding:0 12px 10px 12px"></div>
-      </section>
-      <section class="card">
-        <h2>Regn (mm per intervall)</h2>
-        <div id="rain" class="plot"></div>
-        <div id="rain_stats" class="meta" style="padding:0 12px 10px 12px"></div>
-        <div id="rain_daily" class="meta" style="padding:0 12px 12px 12px; line-height:1.6"></div>
-      </section>
-      <section class="card">
-        <h2>Luftfuktighet (%RH)</h2>
-        <div id="hum" class="plot"></div>
-        <div id="hum_stats" class="meta" style="padding:0 12px 10px 12px"></div>
-      </section>
-      <section class="card">
-        <h2>Snødybde (cm)</h2>
-        <div class="meta" style="padding:0 12px 8px 12px">
-          Visning: 
-          <select id="snow_mode">
-            <option value="follow">Følg valgt periode</option>
-            <option value="all">Hele snøhistorikken</option>
-          </select>
-        </div>
-        <div id="snow" class="plot"></div>
-        <div id="snow_stats" class="meta" style="padding:0 12px 10px 12px"></div>
-      </section>
-    </div>
-  </main>
-
-  <footer>
-    Zoom med mus/fingre. Hold musepekeren over vind-grafen for vindretning (WindHeading).
-  </footer>
-
-  <script>
-    async function loadJSON(path){
-      const r = await fetch(path);
-      if(!r.ok) throw new Error('Kunne ikke laste ' + path);
-      return await r.json();
-    }
+# Selve malen ligger som statisk fil (slipper å kompilere ~400 linjer HTML/JS
+# som Python-streng ved hver kjøring); write_index_html kopierer den ut.
+TEMPLATE_FILE = Path(__file__).resolve().parent / "templates" / "index.html"
 
-    function fmtDate(s){
-      const d = new Date(s);
-      const dd = String(d.getDate()).padStart(2,'0');
-      const mm = String(d.getMonth()+1).padStart(2,'0');
-      const yyyy = d.getFullYear();
-      return `${dd}.${mm}.${yyyy}`;
-    }
 
-    const baseLayout = {
-      margin:{l:60,r:20,t:10,b:40},
-      paper_bgcolor:'#0f1a2f',
-      plot_bgcolor:'#0f1a2f',
-      font:{color:'#e6edf7'},
-      xaxis:{type:'date', gridcolor:'#1e2a44'},
-      yaxis:{gridcolor:'#1e2a44'},
-      legend:{orientation:'h'}
-    };
-
-    function buildSnow(weatherDs, snowDs){
-      const mode = document.getElementById('snow_mode').value;
-      let x = snowDs.time || [];
-      let y = snowDs.snow_cm || [];
-      // Tving datotolking (unngå kategori-akse): bruk Date-objekt
-      let xd = x.map(t => new Date(t));
-
-      if(mode === 'follow' && weatherDs && weatherDs.time && weatherDs.time.length){
-        const t0 = weatherDs.time[0];
-        const t1 = weatherDs.time[weatherDs.time.length-1];
-        const p0 = Date.parse(t0);
-        const p1 = Date.parse(t1);
-
-        const xf = [];
-        const yf = [];
-        for(let i=0;i<xd.length;i++){
-          const pi = xd[i].getTime();
-          if(pi>=p0 && pi<=p1){
-            xf.push(xd[i]);
-            yf.push(y[i]);
-          }
-        }
-        xd = xf; y = yf;
-      }
-
-      const has = x.length && y.length;
-      const layout = {...baseLayout, xaxis:{...baseLayout.xaxis, type:'date'}, yaxis:{title:'cm'}, bargap:0.75};
-
-      if(mode === 'follow' && weatherDs && weatherDs.time && weatherDs.time.length){
-        layout.xaxis = {...layout.xaxis, range:[new Date(weatherDs.time[0]), new Date(weatherDs.time[weatherDs.time.length-1])]} ;
-      }
-
-      // Snø: stolper med fargekoder + "label" på siste stolpe
-      function snowColor(v){
-        if(v==null || isNaN(v)) return 'rgba(0,0,0,0)';
-        if(v<=5) return '#22c55e';      // grønn 0-5
-        if(v<=10) return '#60a5fa';     // blå 5.1-10
-        if(v<=15) return '#facc15';     // gul 10.1-15
-        if(v<=20) return '#ef4444';     // rød 15.1-20
-        return '#7c3aed';               // lilla 20+
-      }
-      const snowColors = y.map(snowColor);
-
-      // Dynamisk stolpebreidde basert på tidsrom mellom målingar (i ms)
-      const tms = xd.map(d => d.getTime());
-      const widths = x.map((_, i) => {
-        const prev = (i>0) ? (tms[i] - tms[i-1]) : null;
-        const next = (i<x.length-1) ? (tms[i+1] - tms[i]) : null;
-        let w;
-        if(prev!=null && next!=null) w = Math.min(prev, next);
-        else if(prev!=null) w = prev;
-        else if(next!=null) w = next;
-        else w = 24*3600*1000; // fallback: 1 døgn
-        // Gjør litt smalare enn "full periode" så det blir luft mellom stolpane
-        // Skaler ned kraftig slik at stolpane ikkje blir "plankar" ved store hol i målingane
-        const scaled = w * 0.18;
-        const minW = 30*60*1000;          // 30 min
-        const maxW = 10*3600*1000;        // maks 10 timar
-        return Math.min(maxW, Math.max(minW, scaled));
-      });
-
-      // Finn siste gyldige måling (for label)
-      let lastIdx = -1;
-      for(let i=y.length-1;i>=0;i--){ if(y[i]!=null && !isNaN(y[i])) { lastIdx=i; break; } }
-
-      const traces = [
-        {
-          x: xd, y,
-          name:'Snødybde',
-          type:'bar',
-          marker:{color: snowColors},
-          width: widths,
-          hovertemplate:'%{x}<br>%{y:.1f} cm<extra></extra>'
-        }
-      ];
-
-      if(lastIdx >= 0){
-        traces.push({
-          x:[xd[lastIdx]],
-          y:[y[lastIdx]],
-          type:'scatter',
-          mode:'text',
-          text:[`${(Math.round(y[lastIdx]*10)/10).toFixed( (Math.abs(y[lastIdx] - Math.round(y[lastIdx]))<1e-9) ? 0 : 1)} cm`],
-          textposition:'top center',
-          hoverinfo:'skip',
-          showlegend:false
-        });
-      }
-
-      Plotly.newPlot('snow', traces, layout, {responsive:true});
-
-      // Enkel stats
-      const el = document.getElementById('snow_stats');
-      if(!has){
-        el.textContent = 'Ingen snømålinger i valgt visning.';
-        return;
-      }
-      let last = null;
-      for(let i=y.length-1;i>=0;i--){
-        if(y[i]!=null && !isNaN(y[i])){ last = {t:x[i], v:y[i]}; break; }
-      }
-      if(last){
-        el.textContent = `Siste måling: ${Math.round(last.v)} cm (${fmtDT(last.t)})`;
-      } else {
-        el.textContent = 'Ingen snømålinger i valgt visning.';
-      }
-    }
+# -------------------- Import/normalisering ----------------------------------
+@dataclass
+class Parsed:
+    df: pd.DataFrame
+    kind: str  # "met" eller "rain"
 
-    function linkXAxes(divIds){
-      // Når du zoomer i én graf, oppdateres de andre.
-      const divs = divIds.map(id => document.getElementById(id));
-      divs.forEach(src => {
-        src.on('plotly_relayout', ev => {
-          const r0 = ev['xaxis.range[0]'];
-          const r1 = ev['xaxis.range[1]'];
-          const autor = ev['xaxis.autorange'];
-          if(r0 && r1){
-            divs.forEach(dst => { if(dst !== src) Plotly.relayout(dst, {'xaxis.range':[r0,r1]}); });
-          } else if(autor){
-            divs.forEach(dst => { if(dst !== src) Plotly.relayout(dst, {'xaxis.autorange': true}); });
-          }
-        });
-      });
-    }
 
-    function buildPlots(ds, label, isAll){
-      setSummaries(ds, label, isAll);
-
-      const x = ds.time;
-
-      // Vind i m/s
-      const wind_ms = ds.windspeed_kmh.map(v => (v==null? null : v/3.6));
-
-      // Vindretning hover: viser både grader og (om ønskelig) enkel tekst
-      function degToCompass(deg){
-        if(deg==null || isNaN(deg)) return '';
-        const dirs = ['N','NNE','NE','ENE','E','ESE','SE','SSE','S','SSW','SW','WSW','W','WNW','NW','NNW'];
-        const ix = Math.round((((deg%360)+360)%360) / 22.5) % 16;
-        return dirs[ix];
-      }
-
-      function sum(arr){
-        let s = 0;
-        for(const v of arr){ if(v!=null && !isNaN(v)) s += v; }
-        return s;
-      }
-
-      function minMax(arr){
-        let mn = null, mx = null;
-        for(const v of arr){
-          if(v==null || isNaN(v)) continue;
-          if(mn==null || v<mn) mn=v;
-          if(mx==null || v>mx) mx=v;
-        }
-        return {min:mn, max:mx};
-      }
-
-      function dailyTotals(ds){
-        const map = new Map();
-        for(let i=0;i<ds.time.length;i++){
-          const mm = ds.rain_mm[i];
-          if(mm==null || isNaN(mm)) continue;
-          const date = ds.time[i].slice(0,10);
-          map.set(date, (map.get(date) || 0) + mm);
-        }
-        return Array.from(map.entries())
-          .sort((a,b)=>a[0].localeCompare(b[0]))
-          .map(([date,total])=>({date,total}));
-      }
-
-      function rainLast24h(ds){
-        if(!ds.time.length) return 0;
-        const tEnd = Date.parse(ds.time[ds.time.length-1]);
-        const tStart = tEnd - 24*3600*1000;
-        let s = 0;
-        for(let i=0;i<ds.time.length;i++){
-          const ti = Date.parse(ds.time[i]);
-          if(ti >= tStart && ti <= tEnd){
-            const v = ds.rain_mm[i];
-            if(v!=null && !isNaN(v)) s += v;
-          }
-        }
-        return s;
-      }
-
-      function fmtDT(ts){
-        if(!ts) return '';
-        const d = new Date(ts);
-        const dd = String(d.getDate()).padStart(2,'0');
-        const mm = String(d.getMonth()+1).padStart(2,'0');
-        const yyyy = d.getFullYear();
-        const hh = String(d.getHours()).padStart(2,'0');
-        const mi = String(d.getMinutes()).padStart(2,'0');
-        return `${dd}.${mm}.${yyyy} ${hh}:${mi}`;
-      }
-
-      function tableHtml(title, rowsHtml){
-        return `
-          <b>${title}</b>
-          <div style="overflow:auto;margin-top:6px">
-            <table style="border-collapse:collapse;min-width:260px">
-              <thead>
-                <tr>
-                  <th style="text-align:left;border-bottom:1px solid #1e2a44;padding:6px 8px">Dato</th>
-                  <th style="text-align:right;border-bottom:1px solid #1e2a44;padding:6px 8px">Nedbør</th>
-                </tr>
-              </thead>
-              <tbody>${rowsHtml}</tbody>
-            </table>
-          </div>`;
-      }
-
-      function setSummaries(ds, label, isAll){
-        // Temperatur
-        const tmm = minMax(ds.temperature_c);
-        let tempText;
-        if(tmm.min==null){
-          tempText = 'Ingen temperaturdata';
-        } else {
-          const iMin = ds.temperature_c.findIndex(v=>v!=null && Math.abs(v - tmm.min) < 1e-9);
-          const iMax = ds.temperature_c.findIndex(v=>v!=null && Math.abs(v - tmm.max) < 1e-9);
-          const tMinAt = (iMin>=0)? ` (${fmtDT(ds.time[iMin])})` : '';
-          const tMaxAt = (iMax>=0)? ` (${fmtDT(ds.time[iMax])})` : '';
-          tempText = `Laveste: ${tmm.min.toFixed(1)} °C${tMinAt} • Høyeste: ${tmm.max.toFixed(1)} °C${tMaxAt}`;
-        }
-        document.getElementById('temp_stats').textContent = (label? `${label} • `:'') + tempText;
-
-        // Vind
-        const wms = ds.windspeed_kmh.map(v => (v==null? null : v/3.6));
-        const wmm = minMax(wms);
-        let maxDir = '';
-        if(wmm.max!=null){
-          const iMax = wms.findIndex(v => v!=null && Math.abs(v - wmm.max) < 1e-9);
-          const hd = (iMax>=0) ? ds.windheading[iMax] : null;
-          if(hd!=null && !isNaN(hd)) maxDir = ` (${degToCompass(hd)})`;
-        }
-        let windText;
-        if(wmm.min==null){
-          windText = 'Ingen vinddata';
-        } else {
-          let maxAt = '';
-          if(wmm.max!=null){
-            const iMax = wms.findIndex(v => v!=null && Math.abs(v - wmm.max) < 1e-9);
-            if(iMax>=0) maxAt = ` (${fmtDT(ds.time[iMax])})`;
-          }
-          windText = `Laveste: ${wmm.min.toFixed(1)} m/s • Høyeste: ${wmm.max.toFixed(1)} m/s${maxDir}${maxAt}`;
-        }
-        document.getElementById('wind_stats').textContent = (label? `${label} • `:'') + windText;
-
-        // Luftfuktighet
-        const hmm = minMax(ds.humidity_rh);
-        const humText = (hmm.min==null) ? 'Ingen fuktdata' : `Laveste: ${hmm.min.toFixed(0)} % • Høyeste: ${hmm.max.toFixed(0)} %`;
-        document.getElementById('hum_stats').textContent = (label? `${label} • `:'') + humText;
-
-        // Regn bokser
-        const monthSum = sum(ds.rain_mm);
-        const last24 = rainLast24h(ds);
-        const rainText = `Siste 24 t: ${last24.toFixed(1)} mm • Sum: ${monthSum.toFixed(1)} mm`;
-        document.getElementById('rain_stats').textContent = (label? `${label} • `:'') + rainText;
-
-        // Regn-tabell
-        const rainDailyEl = document.getElementById('rain_daily');
-        const daily = dailyTotals(ds);
-        if(!daily.length){
-          rainDailyEl.textContent = 'Ingen regndata å summere per døgn.';
-          return;
-        }
+# Header-linje -> (encoding, skilletegn). Stasjonen leverer mange filer med
+# identisk header per batch; da trengs dialekt-sniffingen bare én gang.
+_SNIFF_CACHE: dict[bytes, tuple[str, str]] = {}
 
-        if(isAll){
-          const top = daily.slice().sort((a,b)=>(b.total||0)-(a.total||0)).slice(0,20);
-          const rows = top.map(x=>`<tr><td>${x.date}</td><td style="text-align:right">${(x.total||0).toFixed(1)} mm</td></tr>`).join('');
-          rainDailyEl.innerHTML = tableHtml('20 våteste døgn', rows);
-        } else {
-          const monthStr = ds.time[0].slice(0,7); // YYYY-MM
-          const year = parseInt(monthStr.slice(0,4), 10);
-          const mon = parseInt(monthStr.slice(5,7), 10);
-          const daysInMonth = new Date(year, mon, 0).getDate();
-          const totalsMap = new Map(daily.map(x=>[x.date, x.total]));
-          let rows = '';
-          for(let d=1; d<=daysInMonth; d++){
-            const dd = String(d).padStart(2,'0');
-            const date = `${monthStr}-${dd}`;
-            const total = totalsMap.has(date) ? totalsMap.get(date) : 0;
-            rows += `<tr><td>${date}</td><td style="text-align:right">${(total||0).toFixed(1)} mm</td></tr>`;
-          }
-          rainDailyEl.innerHTML = tableHtml(`Regn per døgn (${monthStr})`, rows);
-        }
-      }
-
-      const windDirTxt = (ds.windheading || []).map(v => (v==null? '' : `Retning: ${degToCompass(v)} (${Math.round(v)}°)`));
-
-      // Temperatur: to farger (<=0 lyseblå, >0 lyserød)
-      const t = ds.temperature_c;
-      const tCold = t.map(v => (v==null ? null : (v<=0 ? v : null)));
-      const tWarm = t.map(v => (v==null ? null : (v>0 ? v : null)));
-
-      Plotly.newPlot('temp', [
-        {x, y: tCold, name:'Temperatur ≤ 0°C', mode:'lines', line:{color:'#7dd3fc'}, hovertemplate:'%{x}<br>%{y:.1f} °C<extra></extra>'},
-        {x, y: tWarm, name:'Temperatur > 0°C', mode:'lines', line:{color:'#fda4af'}, hovertemplate:'%{x}<br>%{y:.1f} °C<extra></extra>'}
-      ], {...baseLayout, yaxis:{title:'°C'}}, {responsive:true});
-
-      Plotly.newPlot('hum', [
-        {x, y: ds.humidity_rh, name:'Fukt', mode:'lines', hovertemplate:'%{x}<br>%{y:.0f} %RH<extra></extra>'}
-      ], {...baseLayout, yaxis:{title:'%RH'}}, {responsive:true});
-
-      // Vind: linje (lett å treffe) + bevar fargekode via markører
-      // NB: ekstremiteter bevares i import (maks per minutt) – se Python-delen.
-      const windMarkerColors = wind_ms.map(v => {
-        if(v==null || isNaN(v)) return 'rgba(0,0,0,0)';
-        if(v<=5) return '#60a5fa';
-        if(v<=11) return '#facc15';
-        if(v<=18) return '#22c55e';
-        if(v<=24) return '#ef4444';
-        return '#7c3aed';
-      });
-
-      Plotly.newPlot('wind', [
-        {
-          x, y: wind_ms,
-          name:'Vind',
-          mode:'lines+markers',
-          marker:{color: windMarkerColors, size:4},
-          line:{width:1.5, color:'#94a3b8'},
-          customdata: windDirTxt,
-          hovertemplate:'%{x}<br>%{y:.1f} m/s<br>%{customdata}<extra></extra>'
-        }
-      ], {...baseLayout, yaxis:{title:'m/s'}}, {responsive:true});
+# Sist vellykkede encoding: filer i samme batch deler som regel encoding,
+# så den prøves først selv når headerne er ulike.
+_LAST_GOOD_ENCODING: str | None = None
 
-      Plotly.newPlot('rain', [
-        {x, y: ds.rain_mm, name:'Regn', mode:'lines', hovertemplate:'%{x}<br>%{y:.2f} mm<extra></extra>'}
-      ], {...baseLayout, yaxis:{title:'mm'}}, {responsive:true});
 
-      linkXAxes(['temp','hum','wind','rain']);
-    }
+def sniff_encoding_and_delimiter(path: Path) -> tuple[str, str]:
+    """Finn encoding og skilletegn fra starten av fila (raskt, uten full parsing)."""
+    with path.open("rb") as f:
+        prefix = f.read(SNIFF_BYTES)
 
-    async function main(){
-      const manifest = await loadJSON('data/manifest.json');
-      const snowDs = await loadJSON('data/' + (manifest.snow || 'snow.json'));
-      window.__snowDs = snowDs;
-      const sel = document.getElementById('month');
-      const info = document.getElementById('info');
-
-      // Legg til "Alle" øverst (gjør det mulig å pan'e på tvers av måneder)
-      const optAll = document.createElement('option');
-      optAll.value = '__ALL__';
-      optAll.textContent = 'Alle (samlet)';
-      sel.appendChild(optAll);
-
-      manifest.months.forEach(m => {
-        const opt = document.createElement('option');
-        opt.value = m.file;
-        opt.textContent = m.label;
-        sel.appendChild(opt);
-      });
-
-      async function loadSelected(){
-        const ds = await (async ()=>{
-          if(sel.value === '__ALL__'){
-            const parts = await Promise.all(manifest.months.map(m => loadJSON('data/' + m.file)));
-            const merged = {time:[], temperature_c:[], humidity_rh:[], windspeed_kmh:[], windheading:[], rain_mm:[]};
-            for(const p of parts){
-              merged.time.push(...(p.time||[]));
-              merged.temperature_c.push(...(p.temperature_c||[]));
-              merged.humidity_rh.push(...(p.humidity_rh||[]));
-              merged.windspeed_kmh.push(...(p.windspeed_kmh||[]));
-              merged.windheading.push(...(p.windheading||[]));
-              merged.rain_mm.push(...(p.rain_mm||[]));
-            }
-            const idx = merged.time.map((t,i)=>[Date.parse(t),i]).sort((a,b)=>a[0]-b[0]).map(x=>x[1]);
-            const pick = (arr)=>idx.map(i=>arr[i]);
-            return {
-              time: pick(merged.time),
-              temperature_c: pick(merged.temperature_c),
-              humidity_rh: pick(merged.humidity_rh),
-              windspeed_kmh: pick(merged.windspeed_kmh),
-              windheading: pick(merged.windheading),
-              rain_mm: pick(merged.rain_mm)
-            };
-          }
-          return await loadJSON('data/' + sel.value);
-        })();
-
-        window.__weatherDs = ds;
-
-        if(!ds.time || !ds.time.length){
-          info.textContent = 'Tomt datasett';
-          return;
-        }
-        info.textContent = `${fmtDate(ds.time[0])} – ${fmtDate(ds.time[ds.time.length-1])} • ${ds.time.length.toLocaleString('no-NO')} punkt` + (sel.value === '__ALL__' ? ' • (samlet)' : '');
-
-        const isAll = (sel.value === '__ALL__');
-        const label = isAll ? 'Alle (samlet)' : sel.options[sel.selectedIndex].textContent;
-        buildPlots(ds, label, isAll);
-        buildSnow(ds, window.__snowDs || {time:[], snow_cm:[]});
-      }
-
-      sel.addEventListener('change', loadSelected);
-
-      // Snø: egen visning (uavhengig av pan/zoom i andre grafer)
-      document.getElementById('snow_mode').addEventListener('change', ()=>{
-        buildSnow(window.__weatherDs || {time:[]}, window.__snowDs || {time:[], snow_cm:[]});
-      });
-
-      if(manifest.months.length){
-        sel.value = '__ALL__';
-        await loadSelected();
-      } else {
-        info.textContent = 'Ingen data ennå – legg CSV-filer i importer/ og kjør scriptet.';
-      }
-    }
+    header = prefix.split(b"\n", 1)[0]
+    cached = _SNIFF_CACHE.get(header)
+    if cached is not None:
+        return cached
 
-    main().catch(err => {
-      document.getElementById('info').textContent = err.message;
-      console.error(err);
-    });
-  </script>
-</body>
-</html>
-"""
+    global _LAST_GOOD_ENCODING
+    candidates = POSSIBLE_ENCODINGS
+    if _LAST_GOOD_ENCODING in POSSIBLE_ENCODINGS:
+        candidates = [_LAST_GOOD_ENCODING] + [e for e in POSSIBLE_ENCODINGS if e != _LAST_GOOD_ENCODING]
 
+    text: str | None = None
+    encoding = candidates[-1]
+    for enc in candidates:
+        try:
+            text = prefix.decode(enc)
+            encoding = enc
+            break
+        except UnicodeDecodeError as e:
+            # Prefikset kan kutte midt i et multibyte-tegn helt på slutten
+            if e.start >= len(prefix) - 4:
+                text = prefix[: e.start].decode(enc)
+                encoding = enc
+                break
 
-# -------------------- Import/normalisering ----------------------------------
-@dataclass
-class Parsed:
-    df: pd.DataFrame
-    kind: str  # "met" eller "rain"
+    if text is None:
+        raise UnicodeDecodeError("unknown", prefix, 0, 1, "Kunne ikke dekode CSV-prefiks")
+
+    delimiter = csv.Sniffer().sniff(text, delimiters=",;\t").delimiter
+    _SNIFF_CACHE[header] = (encoding, delimiter)
+    _LAST_GOOD_ENCODING = encoding
+    return encoding, delimiter
+
+
+# Stasjonen logger tidspunkt i disse formatene (prøves i rekkefølge)
+TIMESTAMP_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]
+
+# Tegn som skal vekk fra WindHeading før tallkonvertering (gradtegn,
+# mellomrom og kompassbokstaver -- det som ikke er del av et tall)
+HEADING_JUNK_TABLE = str.maketrans("", "", "°º " + string.ascii_letters)
+
+# Utrygge filnavntegn -> "_" (for arkivnavn). Tabellen dekker latin-1-
+# området, som er alt stasjonene produserer; bokstaver/siffer (inkl. æøå)
+# står ikke i tabellen og passerer urørt gjennom translate.
+FILENAME_SAFE_TABLE = {
+    o: "_" for o in range(256) if not (chr(o).isalnum() or chr(o) in "._-")
+}
+
+COMPASS_DEG = {
+    "N": 0.0, "NNE": 22.5, "NE": 45.0, "ENE": 67.5,
+    "E": 90.0, "ESE": 112.5, "SE": 135.0, "SSE": 157.5,
+    "S": 180.0, "SSW": 202.5, "SW": 225.0, "WSW": 247.5,
+    "W": 270.0, "WNW": 292.5, "NW": 315.0, "NNW": 337.5,
+}
 
 
 def read_csv_any_encoding(path: Path) -> pd.DataFrame:
+    # Sniff encoding + skilletegn fra et lite prefiks og les med Arrows
+    # flertrådede CSV-parser. Tidskolonnene kommer da ferdig typet, slik at
+    # pd.to_datetime i parse_station_csv blir (nesten) gratis.
+    # pandas-parserne beholdes kun som nødløsning.
+    try:
+        enc, delim = sniff_encoding_and_delimiter(path)
+    except Exception:
+        enc = delim = None
+
+    if enc is not None:
+        try:
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(encoding=enc),
+                parse_options=pacsv.ParseOptions(delimiter=delim),
+                convert_options=pacsv.ConvertOptions(timestamp_parsers=TIMESTAMP_FORMATS),
+            )
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        except Exception:
+            pass
+        try:
+            return pd.read_csv(path, encoding=enc, sep=delim, engine="c", low_memory=False)
+        except Exception:
+            pass
+
     last_err: Exception | None = None
     for enc in POSSIBLE_ENCODINGS:
         try:
@@ -589,31 +189,48 @@ def read_csv_any_encoding(path: Path) -> pd.DataFrame:
     raise last_err or RuntimeError("Kunne ikke lese CSV")
 
 
-def find_col(cols: list[str], keywords: list[str]) -> str | None:
-    low = {c: c.lower() for c in cols}
-    for c, cl in low.items():
-        for kw in keywords:
-            if kw in cl:
-                return c
+def lower_cols(cols: list[str]) -> list[tuple[str, str]]:
+    """Lowercase kolonnenavnene én gang, så slipper find_col å gjøre det per oppslag."""
+    return [(c, c.lower()) for c in cols]
+
+
+def find_col(cols: list[tuple[str, str]], keywords: list[str]) -> str | None:
+    for c, cl in cols:
+        if any(kw in cl for kw in keywords):
+            return c
     return None
 
 
+def as_float(s: pd.Series) -> pd.Series:
+    """Arrow-leseren leverer som regel ferdig-typede tallkolonner; da er det
+    ingen grunn til en ny to_numeric-runde via objekt-arrays."""
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return pd.to_numeric(s, errors="coerce")
+
+
 def parse_station_csv(path: Path) -> Parsed:
     df = read_csv_any_encoding(path)
 
     if "Time" not in df.columns:
         # fallback for varianter som har Date + Time
-        date_col = find_col(list(df.columns), ["date"])
-        time_col = find_col(list(df.columns), ["time"])
+        raw_cols = lower_cols(list(df.columns))
+        date_col = find_col(raw_cols, ["date"])
+        time_col = find_col(raw_cols, ["time"])
         if date_col and time_col:
-            df["Time"] = pd.to_datetime(df[date_col].astype(str) + " " + df[time_col].astype(str), errors="coerce")
+            df["Time"] = pd.to_datetime(
+                df[date_col].astype(str) + " " + df[time_col].astype(str),
+                errors="coerce", format="ISO8601",
+            )
         else:
             raise ValueError(f"Fant ikke Time i {path.name}. Kolonner: {list(df.columns)}")
-    else:
-        df["Time"] = pd.to_datetime(df["Time"], errors="coerce")
+    elif not pd.api.types.is_datetime64_any_dtype(df["Time"]):
+        # ISO8601 dekker alle stasjonsformatene og treffer den
+        # vektoriserte parseren i stedet for dateutil per element
+        df["Time"] = pd.to_datetime(df["Time"], errors="coerce", format="ISO8601")
 
     df = df.dropna(subset=["Time"]).copy().sort_values("Time")
-    cols = list(df.columns)
+    cols = lower_cols(list(df.columns))
 
     # Regn
     rain_rate_col = find_col(cols, ["rain rate", "mm/h", "mm per h", "mm pr h"])
@@ -629,63 +246,118 @@ def parse_station_csv(path: Path) -> Parsed:
     if rain_col or rain_rate_col:
         out = pd.DataFrame({"Time": df["Time"]})
         if rain_rate_col:
-            out["rain_rate_mmh"] = pd.to_numeric(df[rain_rate_col], errors="coerce")
+            out["rain_rate_mmh"] = as_float(df[rain_rate_col])
         if rain_col:
-            out["rain_raw"] = pd.to_numeric(df[rain_col], errors="coerce")
+            out["rain_raw"] = as_float(df[rain_col])
         return Parsed(out, "rain")
 
     out = pd.DataFrame({"Time": df["Time"]})
     if temp_col:
-        out["temperature_c"] = pd.to_numeric(df[temp_col], errors="coerce")
+        out["temperature_c"] = as_float(df[temp_col])
     if hum_col:
-        out["humidity_rh"] = pd.to_numeric(df[hum_col], errors="coerce")
+        out["humidity_rh"] = as_float(df[hum_col])
     if wind_col:
         # NB: om vindkolonnen i fila heter "WindSpeed Km/h" vil den matches av windspeed.
-        out["windspeed_kmh"] = pd.to_numeric(df[wind_col], errors="coerce")
-    if heading_col:
+        out["windspeed_kmh"] = as_float(df[wind_col])
+    if heading_col and pd.api.types.is_numeric_dtype(df[heading_col]):
+        # Arrow har allerede lest gradtall -- ingen strengvask nødvendig
+        out["windheading"] = df[heading_col]
+    elif heading_col:
         # WindHeading kan være grader (0-360) ELLER kompass (N, SW, W ...)
-        s = df[heading_col].astype(str).str.strip()
-        # Fjern evt gradtegn og annet støy
-        s_num = s.str.replace("°", "", regex=False)
-        s_num = s_num.str.replace(r"[^0-9.+-]", "", regex=True)
-        nums = pd.to_numeric(s_num, errors="coerce")
+        h = df[heading_col]
+        s = h.str.strip() if pd.api.types.is_string_dtype(h) else h.astype(str).str.strip()
+        # Fjern evt gradtegn og annet støy (translate-tabell er raskere enn regex)
+        s_num = s.str.translate(HEADING_JUNK_TABLE)
+        # astype("float64") til slutt: Arrow skiller null fra NaN, og
+        # koerserte tomme strenger skal telle som manglende her
+        nums = pd.to_numeric(s_num, errors="coerce").astype("float64")
         if nums.notna().any():
             out["windheading"] = nums
         else:
-            compass = {
-                "N": 0.0, "NNE": 22.5, "NE": 45.0, "ENE": 67.5,
-                "E": 90.0, "ESE": 112.5, "SE": 135.0, "SSE": 157.5,
-                "S": 180.0, "SSW": 202.5, "SW": 225.0, "WSW": 247.5,
-                "W": 270.0, "WNW": 292.5, "NW": 315.0, "NNW": 337.5,
-            }
-            key = s.str.upper().str.replace(" ", "", regex=False)
-            out["windheading"] = key.map(compass)
+            # Kompassrosa har bare 16 verdier: kategoriser først, så skjer
+            # opprydding + oppslag per kategori i stedet for per rad
+            cat = s.astype("category")
+            mapping = {c: COMPASS_DEG.get(str(c).upper().replace(" ", "")) for c in cat.cat.categories}
+            out["windheading"] = cat.map(mapping).astype("float64")
 
     return Parsed(out, "met")
 
 
 def rain_to_interval_mm(rain_df: pd.DataFrame) -> pd.Series:
-    rain_df = rain_df.sort_values("Time")
+    # Regnes rett på numpy-arrayene; pandas-diff/where/fillna-kjeden
+    # allokerte en ny Series per steg.
+    rain_df = sort_if_needed(rain_df, "Time")
+    n = len(rain_df)
 
     if "rain_rate_mmh" in rain_df.columns and rain_df["rain_rate_mmh"].notna().any():
-        rate = rain_df["rain_rate_mmh"].fillna(0)
-        dt = rain_df["Time"].diff().dt.total_seconds().div(3600.0).fillna(0)
-        mm = rate * dt
-        mm[mm < 0] = 0
-        return mm
+        rate = rain_df["rain_rate_mmh"].to_numpy(dtype="float64", na_value=0.0)
+        t = pd.to_datetime(rain_df["Time"]).to_numpy(dtype="datetime64[ns]").view("int64")
+        dt_h = np.zeros(n)
+        if n > 1:
+            dt_h[1:] = np.diff(t) / 3_600_000_000_000.0  # ns -> timer
+        if ne is not None:
+            # Fusjonerer gange + klipping i én flertrådet passering
+            mm = ne.evaluate("where((rate * dt_h) < 0, 0.0, rate * dt_h)")
+        else:
+            mm = rate * dt_h
+            np.maximum(mm, 0.0, out=mm)
+        return pd.Series(mm, index=rain_df.index)
 
     if "rain_raw" in rain_df.columns and rain_df["rain_raw"].notna().any():
-        raw = rain_df["rain_raw"].astype(float)
-        dif = raw.diff()
-        nondec_ratio = (dif.fillna(0) >= 0).mean()
+        raw = rain_df["rain_raw"].to_numpy(dtype="float64", na_value=np.nan)
+        dif = np.empty(n)
+        dif[:1] = np.nan
+        dif[1:] = np.diff(raw)
+        nondec_ratio = (np.nan_to_num(dif) >= 0).mean() if n else 0.0
         if nondec_ratio > 0.90:
             # akkumulerende teller (reset gir negativ diff)
-            dif = dif.where(dif >= 0, 0)
-            return dif.fillna(0)
+            if ne is not None:
+                return pd.Series(ne.evaluate("where(dif >= 0, dif, 0.0)"), index=rain_df.index)
+            return pd.Series(np.where(dif >= 0, dif, 0.0), index=rain_df.index)
         # ser mer ut som intervallverdi allerede
-        return raw
+        return pd.Series(raw, index=rain_df.index)
+
+    return pd.Series([None] * n, index=rain_df.index, dtype="float")
+
 
-    return pd.Series([None] * len(rain_df), index=rain_df.index, dtype="float")
+def sort_if_needed(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Sorter bare når nødvendig: CSV-ene og masteren er allerede sortert,
+    så kolonnen er som regel monotont stigende og sorteringen kan hoppes
+    over. Ellers mergesort -- rask på nesten-sortert input og stabil, så
+    "keep=last" fortsatt betyr at nyeste rad vinner ved lik tid."""
+    s = df[col]
+    if len(df) <= 1 or bool(s.is_monotonic_increasing):
+        return df
+    return df.sort_values(col, kind="mergesort")
+
+
+def upsert_sorted(master: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Oppdater sortert master med fresh: rader med samme Time erstattes,
+    nye legges til. Hash-oppslag (isin) plukker vekk de overlappende radene
+    fra master, så slipper vi å full-sortere hele concat-resultatet og
+    stole på keep="last" -- mergesort på "sortert blokk + liten hale" i
+    sort_if_needed er nesten lineær."""
+    if master.empty:
+        return sort_if_needed(fresh, "Time")
+    kept = master.loc[~master["Time"].isin(fresh["Time"])]
+    return sort_if_needed(pd.concat([kept, fresh], ignore_index=True), "Time")
+
+
+NS_PER_MIN = 60_000_000_000
+
+
+def floor_to_minute(times: pd.Series) -> pd.Series:
+    """Gulv tidspunkt til hele minutt med int64-aritmetikk.
+
+    Tilsvarer .dt.floor("min"), men jobber rett på nanosekund-heltallene
+    uten ny Series per steg. NaT (int64-minverdi) må skjermes fra
+    divisjonen så den ikke blir til en "gyldig" dato.
+    """
+    t = times.to_numpy(dtype="datetime64[ns]")
+    ns = t.view("int64")
+    floored = (ns // NS_PER_MIN) * NS_PER_MIN
+    floored[np.isnat(t)] = np.iinfo("int64").min
+    return pd.Series(floored.view("datetime64[ns]"), index=times.index)
 
 
 # -------------------- Pipeline ------------------------------------------------
@@ -695,53 +367,154 @@ def ensure_dirs() -> None:
         d.mkdir(parents=True, exist_ok=True)
 
 
-def load_master() -> pd.DataFrame:
-    if PARQUET_FILE.exists():
-        return pd.read_parquet(PARQUET_FILE)
-    return pd.DataFrame(columns=["Time", "temperature_c", "humidity_rh", "windspeed_kmh", "windheading", "rain_mm"])
+def _time_filters(time_range: tuple | None) -> list | None:
+    if time_range is None:
+        return None
+    t0, t1 = time_range
+    return [("Time", ">=", pd.Timestamp(t0)), ("Time", "<=", pd.Timestamp(t1))]
+
+
+MASTER_COLUMNS = ["Time", "temperature_c", "humidity_rh", "windspeed_kmh", "windheading", "rain_mm"]
+
+MASTER_SCHEMA = pa.schema([
+    ("Time", pa.timestamp("ns")),
+    ("temperature_c", pa.float64()),
+    ("humidity_rh", pa.float64()),
+    ("windspeed_kmh", pa.float64()),
+    ("windheading", pa.float64()),
+    ("rain_mm", pa.float64()),
+])
 
 
-def load_snow_master() -> pd.DataFrame:
+def load_master(
+    columns: list[str] | None = None,
+    time_range: tuple | None = None,
+    months: set[str] | None = None,
+) -> pd.DataFrame:
+    if PARQUET_FILE.exists():
+        # Kolonnevalg, tidsfilter og månedsfilter dyttes ned i
+        # Parquet-leseren: måneder utenfor months prunes som hele
+        # partisjoner, og row groups utenfor tidsintervallet hoppes over
+        # (save_master skriver sortert, så min/maks-statistikken er tett).
+        filters = _time_filters(time_range) or []
+        if months is not None:
+            if not months:
+                return pd.DataFrame(columns=columns or MASTER_COLUMNS)
+            filters.append(("month", "in", sorted(months)))
+        table = pq.read_table(PARQUET_FILE, columns=columns, filters=filters or None)
+        # Arrow-backede kolonner hele veien: da kan concat mot nye
+        # (Arrow-leste) rader skje uten konvertering via objekt/numpy
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        # partisjonskolonnen er et lagringsdetalj, ikke en datakolonne
+        return df.drop(columns=["month"], errors="ignore")
+    return pd.DataFrame(columns=MASTER_COLUMNS)
+
+
+def load_snow_master(time_range: tuple | None = None) -> pd.DataFrame:
     if SNOW_PARQUET_FILE.exists():
-        return pd.read_parquet(SNOW_PARQUET_FILE)
+        table = pq.read_table(SNOW_PARQUET_FILE, filters=_time_filters(time_range))
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
     return pd.DataFrame(columns=["Time", "snow_cm"])
 
 
+# Sortert skriving + små row groups gir tett min/maks-statistikk for Time,
+# ZSTD + dictionary krymper fila (målingene har mange repeterte verdier).
+PARQUET_WRITE_OPTS = dict(index=False, row_group_size=100_000, compression="zstd", use_dictionary=True)
+
+
 def save_master(df: pd.DataFrame) -> None:
-    df = df.sort_values("Time")
-    df.to_parquet(PARQUET_FILE, index=False)
+    """Skriv master som månedspartisjonert Parquet-katalog
+    (weather.parquet/month=YYYY-MM/...). Bare partisjonene som finnes i df
+    erstattes på disk, så en import rører kun månedene den berører."""
+    df = sort_if_needed(df, "Time").copy()
+    df["month"] = df["Time"].dt.strftime("%Y-%m")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        root_path=PARQUET_FILE,
+        partition_cols=["month"],
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        row_group_size=100_000,
+        compression="zstd",
+        use_dictionary=True,
+    )
+
+
+def migrate_master_layout() -> None:
+    """Engangs: gammel én-fils weather.parquet skrives om til
+    månedspartisjonert katalog med samme navn."""
+    if not PARQUET_FILE.is_file():
+        return
+    df = pq.read_table(PARQUET_FILE).to_pandas(types_mapper=pd.ArrowDtype)
+    PARQUET_FILE.unlink()
+    save_master(df)
 
 
 def save_snow_master(df: pd.DataFrame) -> None:
     df = df.sort_values("Time")
-    df.to_parquet(SNOW_PARQUET_FILE, index=False)
+    df.to_parquet(SNOW_PARQUET_FILE, **PARQUET_WRITE_OPTS)
 
 
-def ingest_import_folder() -> tuple[int, int, str]:
-    master = load_master()
+def load_ingested_hashes() -> dict[str, str]:
+    """Innholds-hash -> filnavn for CSV-er som allerede er lest inn."""
+    if INGESTED_FILE.exists():
+        try:
+            return json.loads(INGESTED_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+    return {}
+
+
+def save_ingested_hashes(hashes: dict[str, str]) -> None:
+    tmp = INGESTED_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(hashes, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, INGESTED_FILE)
+
+
+def file_digest(path: Path) -> str:
+    # blake2b fra stdlib; hashing er uansett langt billigere enn CSV-parsing
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
 
+def ingest_import_folder() -> tuple[int, int, str]:
     files = sorted([p for p in IMPORT_DIR.glob("*.csv") if p.is_file()])
     if not files:
         print("Fant ingen CSV i importer/")
         return (0, 0, "")
 
+    # Hopp over filer vi allerede har lest inn (samme bytes = samme hash);
+    # dedup i masteren tok seg av radene før, men parsingen kostet like mye
+    ingested = load_ingested_hashes()
+    digests = {f: file_digest(f) for f in files}
+    new_files = [f for f in files if digests[f] not in ingested]
+    if len(new_files) < len(files):
+        print(f"Hopper over {len(files) - len(new_files)} allerede innleste filer")
+
     met_parts: list[pd.DataFrame] = []
     rain_parts: list[pd.DataFrame] = []
 
-    for f in files:
-        parsed = parse_station_csv(f)
+    # Parse filene parallelt; stasjonen leverer gjerne flere CSV-er per
+    # periode og parse-jobbene er uavhengige av hverandre
+    if len(new_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(new_files), os.cpu_count() or 1)) as ex:
+            parsed_files = list(ex.map(parse_station_csv, new_files))
+    else:
+        parsed_files = [parse_station_csv(f) for f in new_files]
+
+    for parsed in parsed_files:
         if parsed.kind == "met":
             met_parts.append(parsed.df)
         else:
             rain_parts.append(parsed.df)
 
     if met_parts:
-        met = pd.concat(met_parts, ignore_index=True).drop_duplicates(subset=["Time"]).sort_values("Time")
+        met = sort_if_needed(pd.concat(met_parts, ignore_index=True).drop_duplicates(subset=["Time"]), "Time")
     else:
         met = pd.DataFrame(columns=["Time", "temperature_c", "humidity_rh", "windspeed_kmh", "windheading"])
 
     if rain_parts:
-        rain = pd.concat(rain_parts, ignore_index=True).drop_duplicates(subset=["Time"]).sort_values("Time")
+        rain = sort_if_needed(pd.concat(rain_parts, ignore_index=True).drop_duplicates(subset=["Time"]), "Time")
         rain_mm = rain_to_interval_mm(rain)
         rain2 = pd.DataFrame({"Time": rain["Time"].values, "rain_mm": rain_mm.values})
     else:
@@ -752,18 +525,23 @@ def ingest_import_folder() -> tuple[int, int, str]:
     # Vi runder derfor tidspunkt til nærmeste minutt og slår sammen på det.
     if not met.empty:
         met = met.copy()
-        met["Time_key"] = pd.to_datetime(met["Time"], errors="coerce").dt.floor("min")
-        met = met.dropna(subset=["Time_key"]).sort_values("Time_key")
+        met["Time_key"] = floor_to_minute(met["Time"])
+        met = sort_if_needed(met.dropna(subset=["Time_key"]), "Time_key")
         # ved flere punkter same minutt:
         # - vind: ta maks (bevar ekstremar)
         # - øvrige felt: ta siste
         met = met.sort_values("Time")
         if "windspeed_kmh" in met.columns and met["windspeed_kmh"].notna().any():
-            idx_max = met.groupby("Time_key")["windspeed_kmh"].idxmax()
-            wind_max = met.loc[idx_max, ["Time_key", "windspeed_kmh", "windheading"]]
+            # Plukk rader der vinden er lik minutt-maks via transform("max");
+            # unngår idxmax + .loc-radplukking som blir dyr på store importer
+            gmax = met.groupby("Time_key")["windspeed_kmh"].transform("max")
+            wind_max = met.loc[met["windspeed_kmh"].eq(gmax), ["Time_key", "windspeed_kmh", "windheading"]]
+            wind_max = wind_max.drop_duplicates(subset=["Time_key"], keep="first")
             others = met.drop(columns=["windspeed_kmh", "windheading"], errors="ignore")
             others = others.drop_duplicates(subset=["Time_key"], keep="last")
-            met = pd.merge(others, wind_max, on="Time_key", how="left")
+            # Begge sider er unike på Time_key etter dedup-ene over;
+            # validate fanger det om en stasjonsvariant skulle bryte det
+            met = pd.merge(others, wind_max, on="Time_key", how="left", sort=False, validate="1:1")
         else:
             met = met.drop_duplicates(subset=["Time_key"], keep="last")
     else:
@@ -771,105 +549,331 @@ def ingest_import_folder() -> tuple[int, int, str]:
 
     if not rain2.empty:
         rain2 = rain2.copy()
-        rain2["Time_key"] = pd.to_datetime(rain2["Time"], errors="coerce").dt.floor("min")
-        rain2 = rain2.dropna(subset=["Time_key"]).sort_values("Time_key")
-        # ved flere punkter samme minutt: summer regn
-        rain2 = rain2.groupby("Time_key", as_index=False)["rain_mm"].sum(min_count=1)
+        rain2["Time_key"] = floor_to_minute(rain2["Time"])
+        rain2 = sort_if_needed(rain2.dropna(subset=["Time_key"]), "Time_key")
+        # ved flere punkter samme minutt: summer regn.
+        # Nøklene er sortert, så gruppegrensene finnes med diff/flatnonzero og
+        # summene med add.reduceat -- én passering, ingen hashing som i groupby.
+        keys = rain2["Time_key"].to_numpy(dtype="datetime64[ns]").view("int64")
+        if keys.size:
+            vals = rain2["rain_mm"].to_numpy(dtype="float64", na_value=np.nan)
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+            sums = np.add.reduceat(np.nan_to_num(vals), starts)
+            counts = np.add.reduceat((~np.isnan(vals)).astype("int64"), starts)
+            sums[counts == 0] = np.nan  # som sum(min_count=1): helt tomme minutt blir NA
+            rain2 = pd.DataFrame({"Time_key": keys[starts].view("datetime64[ns]"), "rain_mm": sums})
+        else:
+            rain2 = pd.DataFrame({"Time_key": pd.Series(dtype="datetime64[ns]"), "rain_mm": pd.Series(dtype="float64")})
     else:
         rain2["Time_key"] = pd.Series(dtype="datetime64[ns]")
 
     if not met.empty and not rain2.empty:
-        merged = pd.merge(met.drop(columns=["Time"]), rain2, on="Time_key", how="outer")
+        # sort=False: begge sider kommer ferdig sortert på Time_key, og
+        # sort_if_needed under tar den billige opprydningen etter outer-join.
+        # validate="1:1" fanger stille mange-til-mange-eksplosjoner.
+        merged = pd.merge(met.drop(columns=["Time"]), rain2, on="Time_key", how="outer", sort=False, validate="1:1")
     elif not met.empty:
         merged = met.drop(columns=["Time"]).copy()
-        merged["rain_mm"] = pd.NA
+        # np.nan (ikke pd.NA): kolonnen blir float64 med en gang i stedet
+        # for object, så ingenting må innom objekt-arrays før skjema-casten
+        merged["rain_mm"] = np.nan
     else:
         merged = rain2.copy()
-        merged["temperature_c"] = pd.NA
-        merged["humidity_rh"] = pd.NA
-        merged["windspeed_kmh"] = pd.NA
-        merged["windheading"] = pd.NA
+        merged["temperature_c"] = np.nan
+        merged["humidity_rh"] = np.nan
+        merged["windspeed_kmh"] = np.nan
+        merged["windheading"] = np.nan
 
     # Sett Time til Time_key (minutt-oppløsning)
     merged["Time"] = merged["Time_key"]
     merged = merged.drop(columns=["Time_key"])
 
-    for c in ["temperature_c", "humidity_rh", "windspeed_kmh", "windheading", "rain_mm"]:
-        if c not in merged.columns:
-            merged[c] = pd.NA
-
-    merged = merged[["Time", "temperature_c", "humidity_rh", "windspeed_kmh", "windheading", "rain_mm"]]
-    merged["Time"] = pd.to_datetime(merged["Time"], errors="coerce")
-    merged = merged.dropna(subset=["Time"]).sort_values("Time")
+    # Én reindex legger til manglende kolonner (som NaN) og setter
+    # rekkefølgen i samme pass, i stedet for inntil fem __setitem__ pluss
+    # en kolonneseleksjon.
+    merged = merged.reindex(columns=MASTER_COLUMNS)
+    # Time kommer fra Time_key og er allerede datetime64 -- ingen reparse
+    merged = sort_if_needed(merged.dropna(subset=["Time"]), "Time")
+
+    # Normaliser merged til masterens Arrow-skjema. Da blir concat i
+    # upsert_sorted ren chunk-sammenkjeding (null kopiering av master);
+    # med blandede dtyper ville pandas i stedet materialisert alt på nytt.
+    merged = pa.Table.from_pandas(
+        merged, schema=MASTER_SCHEMA, preserve_index=False
+    ).to_pandas(types_mapper=pd.ArrowDtype)
+
+    # Dedup trenger bare månedene importen berører; resten av historikken
+    # blir liggende urørt i sine partisjoner.
+    touched = set(merged["Time"].dt.strftime("%Y-%m").unique())
+    master = load_master(months=touched)
 
     before = len(master)
     imported_rows = len(merged)
 
-    master2 = pd.concat([master, merged], ignore_index=True)
-    master2 = master2.sort_values("Time").drop_duplicates(subset=["Time"], keep="last")
+    # Nyeste import vinner ved duplikat tidspunkt (merged er unik på Time)
+    master2 = upsert_sorted(master, merged)
 
     after = len(master2)
     dedup_removed = (before + imported_rows) - after
 
-    # Fyll manglende vindretning med siste kjente (gir bedre hover i graf)
+    # Fyll manglende vindretning med siste kjente (gir bedre hover i graf).
+    # master2 kommer ferdig sortert fra upsert_sorted, så ingen ny sortering.
     try:
-        master2 = master2.sort_values("Time")
         master2["windheading"] = master2["windheading"].ffill()
     except Exception:
         pass
     save_master(master2)
 
     # Periode-navn basert på alle tider vi nettopp importerte
-    t0 = pd.to_datetime(merged["Time"].min())
-    t1 = pd.to_datetime(merged["Time"].max())
+    t0 = merged["Time"].min()
+    t1 = merged["Time"].max()
     bundle = "unknown"
     if not pd.isna(t0) and not pd.isna(t1):
         bundle = f"{t0.strftime('%Y-%m-%d')}_{t1.strftime('%Y-%m-%d')}"
 
-    # Flytt CSV-er til arkiv med ryddig navn
+    # Flytt CSV-er til arkiv med ryddig navn. Én scandir gir hele
+    # navnelista; kollisjonssjekken blir da et set-oppslag i stedet for
+    # et stat-kall per kandidatnavn.
+    with os.scandir(ARCHIVE_DIR) as it:
+        existing = {e.name for e in it}
     for f in files:
-        safe = "".join(ch if ch.isalnum() or ch in "._-" else "_" for ch in f.stem)
-        target = ARCHIVE_DIR / f"{bundle}__{safe}.csv"
+        safe = f.stem.translate(FILENAME_SAFE_TABLE)
+        name = f"{bundle}__{safe}.csv"
         i = 2
-        while target.exists():
-            target = ARCHIVE_DIR / f"{bundle}__{safe}({i}).csv"
+        while name in existing:
+            name = f"{bundle}__{safe}({i}).csv"
             i += 1
-        shutil.move(str(f), str(target))
+        existing.add(name)
+        shutil.move(str(f), str(ARCHIVE_DIR / name))
+
+    for f in files:
+        ingested[digests[f]] = f.name
+    save_ingested_hashes(ingested)
 
-    print(f"Importerte {len(files)} filer og arkiverte dem")
+    print(f"Importerte {len(new_files)} filer og arkiverte {len(files)}")
     return (imported_rows, dedup_removed, bundle)
 
 
-def generate_monthly_json() -> list[dict]:
-    master = load_master()
-    if master.empty:
-        return []
+SERIES_COLUMNS = ["temperature_c", "humidity_rh", "windspeed_kmh", "windheading", "rain_mm"]
 
-    master = master.copy()
-    master["Time"] = pd.to_datetime(master["Time"], errors="coerce")
-    master = master.dropna(subset=["Time"]).sort_values("Time")
-    master["month"] = master["Time"].dt.strftime("%Y-%m")
 
-    months: list[dict] = []
-    for m, g in master.groupby("month"):
-        g = g.sort_values("Time")
-        out = {
-            "time": g["Time"].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist(),
-            "temperature_c": [None if pd.isna(v) else float(v) for v in g["temperature_c"]],
-            "humidity_rh": [None if pd.isna(v) else float(v) for v in g["humidity_rh"]],
-            "windspeed_kmh": [None if pd.isna(v) else float(v) for v in g["windspeed_kmh"]],
-            "windheading": [None if pd.isna(v) else float(v) for v in g["windheading"]],
-            "rain_mm": [None if pd.isna(v) else float(v) for v in g["rain_mm"]]
-        }
+def series_stats(g: pd.DataFrame) -> dict:
+    """Forhåndsberegnede nøkkeltall for ett datasett.
+
+    Samme tall som nettsiden ellers måtte regne ut i JavaScript for hver
+    visning (min/maks med tidspunkt, regnsum, siste 24 t og døgntotaler) --
+    her gjøres det vektorisert én gang ved bygging.
+    """
+    times = g["Time"].to_numpy(dtype="datetime64[s]")
+
+    def iso(i: int | None) -> str | None:
+        return None if i is None else str(times[i])
+
+    def min_max(arr: np.ndarray) -> tuple:
+        if arr.size == 0 or np.isnan(arr).all():
+            return None, None, None, None
+        imin = int(np.nanargmin(arr))
+        imax = int(np.nanargmax(arr))
+        return float(arr[imin]), imin, float(arr[imax]), imax
+
+    temp = g["temperature_c"].to_numpy(dtype="float64", na_value=np.nan)
+    hum = g["humidity_rh"].to_numpy(dtype="float64", na_value=np.nan)
+    wind = g["windspeed_kmh"].to_numpy(dtype="float64", na_value=np.nan)
+    heading = g["windheading"].to_numpy(dtype="float64", na_value=np.nan)
+    rain = g["rain_mm"].to_numpy(dtype="float64", na_value=np.nan)
+
+    t_min, t_imin, t_max, t_imax = min_max(temp)
+    h_min, _, h_max, _ = min_max(hum)
+    w_min, _, w_max, w_imax = min_max(wind)
+
+    heading_at_max = None
+    if w_imax is not None and not np.isnan(heading[w_imax]):
+        heading_at_max = float(heading[w_imax])
+
+    rain_sum = float(np.nansum(rain)) if rain.size else 0.0
+    last24h = 0.0
+    if times.size:
+        mask = times >= (times[-1] - np.timedelta64(24, "h"))
+        last24h = float(np.nansum(rain[mask]))
+
+    valid = ~np.isnan(rain)
+    daily: list[dict] = []
+    if valid.any():
+        days = times[valid].astype("datetime64[D]").astype(str)
+        totals = pd.Series(rain[valid]).groupby(days).sum()
+        daily = [{"date": d, "total": float(v)} for d, v in totals.items()]
+
+    return {
+        "temperature_c": {"min": t_min, "min_at": iso(t_imin), "max": t_max, "max_at": iso(t_imax)},
+        "windspeed_kmh": {"min": w_min, "max": w_max, "max_at": iso(w_imax), "heading_at_max": heading_at_max},
+        "humidity_rh": {"min": h_min, "max": h_max},
+        "rain_mm": {"sum": rain_sum, "last24h": last24h, "daily": daily},
+    }
+
+
+def floats_or_none(s: pd.Series) -> list:
+    """Kolonne som liste med None for NaN -- via numpy, uten test per verdi
+    i Python. tolist() gjør konverteringen i C; bare NaN-posisjonene (funnet
+    med flatnonzero) røres etterpå."""
+    arr = s.to_numpy(dtype="float64", na_value=np.nan)
+    out = arr.tolist()
+    for i in np.flatnonzero(np.isnan(arr)):
+        out[i] = None
+    return out
+
+
+def write_series_json(path: Path, g: pd.DataFrame) -> None:
+    """Skriv et måneds-datasett som JSON.
+
+    Med orjson serialiseres numpy-arrayene direkte (datetime64[s] blir
+    "%Y-%m-%dT%H:%M:%S" og NaN blir null), uten Python-objekt per verdi.
+    Uten orjson brukes den gamle listebaserte stdlib-varianten.
+    """
+    if orjson is not None:
+        out = {"time": g["Time"].to_numpy(dtype="datetime64[s]")}
+        for c in SERIES_COLUMNS:
+            out[c] = g[c].to_numpy(dtype="float64", na_value=np.nan)
+        out["stats"] = series_stats(g)
+        path.write_bytes(orjson.dumps(out, option=orjson.OPT_SERIALIZE_NUMPY))
+        return
+
+    # numpy formaterer datetime64[s] som ISO-sekunder i C -- identisk med
+    # strftime("%Y-%m-%dT%H:%M:%S"), men uten et Python-kall per rad
+    out = {"time": g["Time"].to_numpy(dtype="datetime64[s]").astype(str).tolist()}
+    for c in SERIES_COLUMNS:
+        out[c] = floats_or_none(g[c])
+    out["stats"] = series_stats(g)
+    path.write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
 
-        fname = f"{m}.json"
-        (DATA_DIR / fname).write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
-        months.append({"label": m, "file": fname})
 
-    months.sort(key=lambda x: x["label"], reverse=True)
+def write_series_parquet(path: Path, g: pd.DataFrame) -> None:
+    """Parquet-kopi av et datasett (samme kolonner som JSON-en).
+
+    3-5x mindre enn JSON-en og ferdig typet -- for klienter som kan lese
+    Arrow/Parquet direkte. Selve nettsiden leser fortsatt JSON, siden den
+    skal funke rett fra file:// uten bundler eller wasm-moduler.
+    """
+    cols = g[["Time"] + SERIES_COLUMNS].rename(columns={"Time": "time"})
+    cols.to_parquet(path, **PARQUET_WRITE_OPTS)
+
+
+def generate_monthly_json(touched_months: set[str] | None = None) -> None:
+    """Skriv måneds-filene i data/.
+
+    touched_months=None betyr full regenerering. Ellers skrives bare
+    månedene importen berørte, pluss måneder der JSON-fila mangler på
+    disk -- med år med historikk blir en vanlig kjøring da nesten
+    konstant i tid i stedet for O(alle måneder).
+    """
+    # Hvilke måneder finnes? Les bare Time-kolonnen (billig via Parquet),
+    # ikke hele datasettet.
+    times = load_master(columns=["Time"])
+    if times.empty:
+        return
+    t = times["Time"].dropna()
+    all_months = sorted(t.dt.strftime("%Y-%m").unique())
+
+    if touched_months is None:
+        regen = set(all_months)
+    else:
+        regen = {m for m in all_months
+                 if m in touched_months or not (DATA_DIR / f"{m}.json").exists()}
+
+    if regen:
+        # Parquet leverer Time ferdig typet; ingen reparse nødvendig
+        master = load_master(months=regen)
+        master = sort_if_needed(master.dropna(subset=["Time"]), "Time")
+        # Sortert på Time betyr at månedene ligger som sammenhengende
+        # blokker: np.unique gir blokkstartene direkte, og hver måned blir
+        # en billig iloc-slice -- ingen hash-groupby eller månedskolonne.
+        month_arr = master["Time"].dt.strftime("%Y-%m").to_numpy()
+        keys, starts = np.unique(month_arr, return_index=True)
+        bounds = np.append(starts, len(month_arr))
+        tasks = [
+            (m, master.iloc[bounds[i]:bounds[i + 1]])
+            for i, m in enumerate(keys)
+            if m in regen
+        ]
+
+        def write_month(item: tuple[str, pd.DataFrame]) -> None:
+            m, g = item
+            write_series_json(DATA_DIR / f"{m}.json", g)
+            write_series_parquet(DATA_DIR / f"{m}.parquet", g)
+
+        if len(tasks) > 1:
+            # Månedene er uavhengige, og både filskrivingen og orjson/
+            # pyarrow-serialiseringen slipper GIL-en -- tråder overlapper
+            # dermed I/O-en uten prosess-overhead.
+            with ThreadPoolExecutor(max_workers=min(8, len(tasks))) as ex:
+                list(ex.map(write_month, tasks))
+        else:
+            for item in tasks:
+                write_month(item)
+
+    # Rydd vekk måneds-filer som ikke lenger finnes i masteren, slik at
+    # katalog-lista i list_month_files alltid speiler dataene.
+    known = set(all_months)
+    for p in DATA_DIR.glob("????-??.json"):
+        if p.stem not in known:
+            p.unlink(missing_ok=True)
+            (DATA_DIR / f"{p.stem}.parquet").unlink(missing_ok=True)
+
+
+def list_month_files() -> list[dict]:
+    """Månedslista til manifestet -- én scandir av data/, ingen lesing av
+    selve dataene (generate_monthly_json holder katalogen i synk)."""
+    with os.scandir(DATA_DIR) as it:
+        names = {e.name for e in it}
+    months: list[dict] = []
+    for n in sorted(names, reverse=True):
+        if len(n) == 12 and n.endswith(".json") and n[:4].isdigit() and n[4] == "-" and n[5:7].isdigit():
+            entry = {"label": n[:7], "file": n}
+            if f"{n[:7]}.parquet" in names:
+                entry["parquet"] = f"{n[:7]}.parquet"
+            months.append(entry)
     return months
 
 
+ALL_JSON_FILE = DATA_DIR / "all.json"
+ALL_MIN_JSON_FILE = DATA_DIR / "all.min.json"
+ALL_PARQUET_FILE = DATA_DIR / "all.parquet"
+
+
+def generate_all_json() -> bool:
+    """Skriv hele historikken samlet til data/all.json (+ en lavoppløst
+    time-for-time-utgave for rask første-visning).
+
+    Da slipper nettleseren å hente alle månedsfilene og flette/sortere dem
+    selv for "Alle (samlet)"-visningen.
+    """
+    master = load_master()
+    if master.empty:
+        return False
+
+    master = sort_if_needed(master.dropna(subset=["Time"]), "Time")
+    write_series_json(ALL_JSON_FILE, master)
+    # Binær søsterfil som for månedene: 3-5x mindre for klienter som
+    # leser Arrow/Parquet; nettsiden selv holder seg til JSON (file://)
+    write_series_parquet(ALL_PARQUET_FILE, master)
+
+    hourly = (
+        master.set_index("Time")
+        .resample("1h")
+        .agg({
+            "temperature_c": "mean",
+            "humidity_rh": "mean",
+            "windspeed_kmh": "max",   # bevar ekstremane i oversikta
+            "windheading": "last",
+            "rain_mm": lambda s: s.sum(min_count=1),
+        })
+        .dropna(how="all")
+        .rename_axis("Time")  # resample mister indeksnavnet på Arrow-tidsstempler
+        .reset_index()
+    )
+    write_series_json(ALL_MIN_JSON_FILE, hourly)
+    return True
+
+
 def ingest_snow_file() -> int:
     """Les manuelt/sno.csv og oppdater store/snow.parquet.
 
@@ -883,6 +887,16 @@ def ingest_snow_file() -> int:
     if not SNOW_CSV_FILE.exists():
         return 0
 
+    # Uendret fil siden forrige kjøring? Da står parquet-en allerede riktig,
+    # og hele parse/dedup-løypa kan hoppes over.
+    st = SNOW_CSV_FILE.stat()
+    stamp = f"{st.st_mtime_ns}:{st.st_size}"
+    try:
+        if SNOW_STAMP_FILE.read_text() == stamp:
+            return 0
+    except OSError:
+        pass
+
     df = read_csv_any_encoding(SNOW_CSV_FILE)
 
     # Finn kolonner
@@ -901,7 +915,10 @@ def ingest_snow_file() -> int:
         raise ValueError(f"manuelt/sno.csv må ha kolonnene Date og Snow_cm. Fant: {list(df.columns)}")
 
     out = pd.DataFrame()
-    out["Time"] = pd.to_datetime(df[date_col], errors="coerce").dt.normalize()
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce", format="ISO8601")
+    out["Time"] = dates.dt.normalize()
     # Støtter desimal med punkt (12.4). Hvis noen likevel skriver 12,4, prøv å konvertere.
     s = df[snow_col].astype(str).str.strip()
     s = s.str.replace(",", ".", regex=False)
@@ -909,6 +926,7 @@ def ingest_snow_file() -> int:
     out = out.dropna(subset=["Time"]).sort_values("Time")
 
     if out.empty:
+        SNOW_STAMP_FILE.write_text(stamp)
         return 0
 
     # Overskriv per dato (siste vinner)
@@ -916,10 +934,9 @@ def ingest_snow_file() -> int:
     out = out.drop_duplicates(subset=["Time"], keep="last")
 
     master = load_snow_master()
-    before = len(master)
-    master2 = pd.concat([master, out], ignore_index=True)
-    master2 = master2.sort_values("Time").drop_duplicates(subset=["Time"], keep="last")
+    master2 = upsert_sorted(master, out)
     save_snow_master(master2)
+    SNOW_STAMP_FILE.write_text(stamp)
 
     return len(out)
 
@@ -927,31 +944,68 @@ def ingest_snow_file() -> int:
 def generate_snow_json() -> None:
     master = load_snow_master()
     if master.empty:
-        SNOW_JSON_FILE.write_text(json.dumps({"time": [], "snow_cm": []}, ensure_ascii=False), encoding="utf-8")
+        write_json(SNOW_JSON_FILE, {"time": [], "snow_cm": []})
         return
 
-    master = master.copy()
-    master["Time"] = pd.to_datetime(master["Time"], errors="coerce")
-    master = master.dropna(subset=["Time"]).sort_values("Time")
+    master = sort_if_needed(master.dropna(subset=["Time"]), "Time")
+
+    if orjson is not None:
+        out = {
+            "time": master["Time"].to_numpy(dtype="datetime64[s]"),
+            "snow_cm": master["snow_cm"].to_numpy(dtype="float64", na_value=np.nan),
+        }
+        SNOW_JSON_FILE.write_bytes(orjson.dumps(out, option=orjson.OPT_SERIALIZE_NUMPY))
+        return
 
     out = {
-        "time": master["Time"].dt.strftime("%Y-%m-%dT%H:%M:%S").tolist(),
-        "snow_cm": [None if pd.isna(v) else float(v) for v in master["snow_cm"]],
+        "time": master["Time"].to_numpy(dtype="datetime64[s]").astype(str).tolist(),
+        "snow_cm": floats_or_none(master["snow_cm"]),
     }
     SNOW_JSON_FILE.write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
 
 
-def write_manifest(months: list[dict]) -> None:
+def write_json(path: Path, payload: dict, indent: bool = False) -> None:
+    """Liten JSON-fil via orjson om tilgjengelig (bytes rett til disk),
+    ellers stdlib json."""
+    if orjson is not None:
+        opts = orjson.OPT_INDENT_2 if indent else 0
+        path.write_bytes(orjson.dumps(payload, option=opts))
+        return
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2 if indent else None), encoding="utf-8")
+
+
+def write_manifest(months: list[dict], has_all: bool = False) -> None:
     # Snødata ligger alltid i data/snow.json (uavhengig av måneder)
-    MANIFEST_FILE.write_text(json.dumps({"months": months, "snow": "snow.json"}, ensure_ascii=False, indent=2), encoding="utf-8")
+    payload: dict = {"months": months, "snow": "snow.json"}
+    if has_all:
+        payload["all"] = ALL_JSON_FILE.name
+        payload["all_min"] = ALL_MIN_JSON_FILE.name
+        payload["all_parquet"] = ALL_PARQUET_FILE.name
+    write_json(MANIFEST_FILE, payload, indent=True)
 
 
 def write_index_html() -> None:
-    INDEX_HTML.write_text(HTML_TEMPLATE, encoding="utf-8")
+    # Hardlenk malen inn som index.html -- gratis og alltid i synk.
+    # Fallback: copyfile (sendfile på Linux) der lenking ikke støttes.
+    try:
+        st_t = TEMPLATE_FILE.stat()
+        st_i = INDEX_HTML.stat()
+        same_inode = st_i.st_ino == st_t.st_ino and st_i.st_dev == st_t.st_dev
+        fresh_copy = st_i.st_size == st_t.st_size and st_i.st_mtime >= st_t.st_mtime
+        if same_inode or fresh_copy:
+            return  # allerede i synk -- ikke rør fila (bevarer mtime/caching)
+    except OSError:
+        pass
+    try:
+        INDEX_HTML.unlink(missing_ok=True)
+        os.link(TEMPLATE_FILE, INDEX_HTML)
+    except OSError:
+        shutil.copyfile(TEMPLATE_FILE, INDEX_HTML)
 
 
 def main() -> None:
     ensure_dirs()
+    migrate_master_layout()
 
     imported_rows, dedup_removed, bundle = ingest_import_folder()
 
@@ -961,9 +1015,22 @@ def main() -> None:
     except Exception as e:
         print("⚠️ Snøimport feil:", e)
 
-    months = generate_monthly_json()
+    # Regenerer bare månedene importen faktisk berørte
+    touched: set[str] | None = None
+    if not bundle:
+        touched = set()  # ingenting importert
+    elif bundle != "unknown":
+        try:
+            t0s, t1s = bundle.split("_")
+            touched = {str(p) for p in pd.period_range(t0s, t1s, freq="M")}
+        except Exception:
+            touched = None  # uventet periode-navn: full regenerering
+
+    generate_monthly_json(touched)
+    months = list_month_files()
+    has_all = generate_all_json()
     generate_snow_json()
-    write_manifest(months)
+    write_manifest(months, has_all)
     write_index_html()
 
     print("Oppdatert værhistorikk!")
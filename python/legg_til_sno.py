@@ -11,21 +11,37 @@ def read_existing() -> dict[str, str]:
         return {}
     data: dict[str, str] = {}
     with SNOW.open("r", encoding="utf-8", newline="") as f:
-        r = csv.DictReader(f)
+        r = csv.reader(f)
+        header = next(r, None)
+        if header is None:
+            return data
+        # posisjonsbasert lesing: slipper dict-allokering per rad
+        di = header.index("Date")
+        si = header.index("Snow_cm")
         for row in r:
-            d = (row.get("Date") or "").strip()
-            v = (row.get("Snow_cm") or "").strip()
+            if len(row) <= max(di, si):
+                continue
+            d = row[di].strip()
             if d:
-                data[d] = v
+                data[d] = row[si].strip()
     return data
 
 def write_all(data: dict[str, str]) -> None:
     MANUAL.mkdir(parents=True, exist_ok=True)
     with SNOW.open("w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=["Date", "Snow_cm"])
-        w.writeheader()
-        for d in sorted(data.keys()):
-            w.writerow({"Date": d, "Snow_cm": data[d]})
+        w = csv.writer(f)
+        w.writerow(["Date", "Snow_cm"])
+        w.writerows((d, data[d]) for d in sorted(data))
+
+def append_one(d: str, v: str) -> None:
+    """Legg til én rad nederst i fila -- slipper å skrive alt på nytt."""
+    new_file = not SNOW.exists()
+    MANUAL.mkdir(parents=True, exist_ok=True)
+    with SNOW.open("a", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        if new_file:
+            w.writerow(["Date", "Snow_cm"])
+        w.writerow([d, v])
 
 def ask_date() -> str:
     year = input("År (YYYY): ").strip()
@@ -50,9 +66,15 @@ def main() -> None:
             print("Ugyldig snøverdi. Bruk tall, f.eks. 12.4")
             continue
 
-        # Overskriv dato hvis den finnes
+        # Ny dato sist i rekka kan bare appendes (vanligste tilfelle:
+        # dagens måling). Overskriving eller dato midt i historikken
+        # krever full sortert omskriving som før.
+        is_append = d not in data and (not data or d > max(data))
         data[d] = v
-        write_all(data)
+        if is_append:
+            append_one(d, v)
+        else:
+            write_all(data)
         print(f"Lagra: {d} = {v} cm  (fil: {SNOW})")
 
         more = input("Registrere flere målinger? (j/n): ").strip().lower()